@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+import pytest
+import yfinance as yf
+
+from utils.data_fetcher import fetch_stock_data, fetch_stock_data_batch
+
+# Exchange timezone of each ticker; their daily bars start at local midnight
+TIMEZONES = {'AAPL': 'America/New_York', '7203.T': 'Asia/Tokyo'}
+
+
+def fake_history(self, period="1mo", interval="1d", **kwargs):
+    """Stand-in for Ticker.history returning bars in the ticker's exchange timezone."""
+    index = pd.date_range('2024-03-04', periods=5, freq='D',
+                          tz=TIMEZONES[self.ticker], name='Date')
+    close = np.linspace(100.0, 104.0, len(index)) + len(self.ticker)
+    return pd.DataFrame({
+        'Open': close - 0.5,
+        'High': close + 1.0,
+        'Low': close - 1.0,
+        'Close': close,
+        'Volume': np.arange(1000, 1000 + len(index)),
+        'Dividends': 0.0,
+        'Stock Splits': 0.0,
+    }, index=index)
+
+
+@pytest.fixture
+def yahoo(monkeypatch):
+    # Both yf.download and fetch_stock_data go through Ticker.history
+    monkeypatch.setattr(yf.Ticker, 'history', fake_history)
+
+
+def test_batch_matches_single_fetch_across_timezones(yahoo):
+    batch = fetch_stock_data_batch(list(TIMEZONES), period="5d", interval="1d")
+
+    assert set(batch) == set(TIMEZONES)
+    for ticker in TIMEZONES:
+        single = fetch_stock_data(ticker, period="5d", interval="1d")
+        pd.testing.assert_frame_equal(batch[ticker], single, check_dtype=False)
+        # Daily bars stay on their own exchange's dates
+        assert list(batch[ticker]['Date'].dt.day) == [4, 5, 6, 7, 8]
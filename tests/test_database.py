@@ -0,0 +1,57 @@
+import datetime
+import os
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+# utils.database connects on import; the tests below use their own engine
+os.environ.setdefault('DATABASE_URL', 'sqlite://')
+
+from utils.database import Base, load_portfolio, save_portfolio  # noqa: E402
+
+
+@pytest.fixture
+def db():
+    engine = create_engine('sqlite://')
+    Base.metadata.create_all(bind=engine)
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+        engine.dispose()
+
+
+def position(quantity, avg_price, position_type='LONG'):
+    return {
+        'quantity': quantity,
+        'avg_price': avg_price,
+        'position_type': position_type,
+        'timestamp': datetime.datetime(2024, 3, 4, 10, 30),
+        'confidence_score': 0.5,
+    }
+
+
+def test_closed_position_is_not_restored(db):
+    portfolio = {'AAPL': position(10, 180.0), 'TSLA': position(5, 200.0, 'SHORT')}
+    save_portfolio(portfolio, db=db)
+
+    # Selling the whole AAPL position removes it, as trade_controls does
+    del portfolio['AAPL']
+    save_portfolio(portfolio, db=db)
+
+    restored = load_portfolio(db=db)
+    assert set(restored) == {'TSLA'}
+    assert restored['TSLA']['quantity'] == 5
+    assert restored['TSLA']['position_type'] == 'SHORT'
+
+
+def test_partially_closed_position_keeps_remaining_quantity(db):
+    portfolio = {'AAPL': position(10, 180.0)}
+    save_portfolio(portfolio, db=db)
+
+    portfolio['AAPL']['quantity'] -= 4
+    save_portfolio(portfolio, db=db)
+
+    assert load_portfolio(db=db)['AAPL']['quantity'] == 6
@@ -0,0 +1,13 @@
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    # Numba is optional; without it kernels run as plain Python and callers
+    # prefer their pandas/numpy paths
+    NUMBA_AVAILABLE = False
+
+    def njit(*args, **kwargs):
+        """Stand-in for numba.njit that returns the function unchanged."""
+        if args and callable(args[0]):
+            return args[0]
+        return lambda func: func
@@ -0,0 +1,117 @@
+import numpy as np
+from utils._njit import njit, NUMBA_AVAILABLE
+
+@njit(cache=True, nogil=True)
+def _backtest_pass(returns, signal):
+    """
+    Strategy returns, both cumulative return curves, win/loss counts and the
+    strategy's volatility in one loop over the bars.
+
+    Matches the numpy path: each signal is traded on the following bar, NaN
+    returns compound as 1 and the volatility is the sample standard deviation
+    (ddof=1) of the non-NaN strategy returns, updated with Welford's method.
+    """
+    n = len(returns)
+    strategy_returns = np.empty(n)
+    cumulative_returns = np.empty(n)
+    strategy_cumulative_returns = np.empty(n)
+    growth = 1.0
+    strategy_growth = 1.0
+    winning = 0
+    losing = 0
+    count = 0
+    mean = 0.0
+    m2 = 0.0
+    for i in range(n):
+        if not np.isnan(returns[i]):
+            growth *= 1 + returns[i] / 100
+        cumulative_returns[i] = growth - 1
+        
+        # The first bar has no position
+        value = returns[i] * signal[i - 1] if i > 0 else np.nan
+        strategy_returns[i] = value
+        if not np.isnan(value):
+            strategy_growth *= 1 + value / 100
+            if value > 0:
+                winning += 1
+            elif value < 0:
+                losing += 1
+            count += 1
+            delta = value - mean
+            mean += delta / count
+            m2 += delta * (value - mean)
+        strategy_cumulative_returns[i] = strategy_growth - 1
+    volatility = np.sqrt(m2 / (count - 1)) if count > 1 else 0.0
+    return strategy_returns, cumulative_returns, strategy_cumulative_returns, winning, losing, volatility
+
+def warm_up_kernels():
+    """Compile the backtest kernel by running it once on a small series."""
+    if not NUMBA_AVAILABLE:
+        return
+    _backtest_pass(np.linspace(-1.0, 1.0, 64), np.ones(64))
+
+def run_backtest(df, risk_free_rate=0.0):
+    """
+    Run a simple backtest that trades each signal on the following bar.
+
+    Args:
+        df (pandas.DataFrame): The stock data DataFrame with 'signal' and 'Close_pct_change' columns.
+        risk_free_rate (float): Risk-free return in percent used for the Sharpe ratio.
+
+    Returns:
+        dict: Dictionary containing per-bar strategy returns, cumulative returns for
+            buy & hold and for the strategy, and summary performance metrics.
+    """
+    if df.empty:
+        # Nothing to trade; report empty curves and zeroed metrics
+        empty = np.empty(0)
+        return {
+            'strategy_returns': empty,
+            'cumulative_returns': empty,
+            'strategy_cumulative_returns': empty,
+            'winning_trades': 0,
+            'losing_trades': 0,
+            'win_rate': 0,
+            'strategy_return': 0,
+            'sharpe_ratio': 0
+        }
+
+    signal = df['signal'].to_numpy(dtype=np.float64)
+    returns = df['Close_pct_change'].to_numpy(dtype=np.float64)
+
+    if NUMBA_AVAILABLE:
+        (strategy_returns, cumulative_returns, strategy_cumulative_returns,
+         winning_trades, losing_trades, strategy_volatility) = _backtest_pass(returns, signal)
+    else:
+        # Shift signals so we trade on the next bar; the first bar has no position
+        strategy_returns = np.empty_like(returns)
+        strategy_returns[0] = np.nan
+        strategy_returns[1:] = returns[1:] * signal[:-1]
+        
+        # Calculate cumulative returns (bars without a position compound as 1)
+        cumulative_returns = np.nancumprod(1 + returns / 100) - 1
+        strategy_cumulative_returns = np.nancumprod(1 + strategy_returns / 100) - 1
+        
+        winning_trades = int(np.count_nonzero(strategy_returns > 0))
+        losing_trades = int(np.count_nonzero(strategy_returns < 0))
+        valid_returns = strategy_returns[~np.isnan(strategy_returns)]
+        strategy_volatility = valid_returns.std(ddof=1) if len(valid_returns) > 1 else 0
+    
+    # Calculate win rate and other metrics
+    total_trades = winning_trades + losing_trades
+    win_rate = (winning_trades / total_trades * 100) if total_trades > 0 else 0
+    
+    # Calculate Sharpe ratio (simplified)
+    strategy_return = strategy_cumulative_returns[-1] * 100
+    sharpe_ratio = (strategy_return - risk_free_rate) / strategy_volatility if strategy_volatility > 0 else 0
+
+    return {
+        'strategy_returns': strategy_returns,
+        'cumulative_returns': cumulative_returns,
+        'strategy_cumulative_returns': strategy_cumulative_returns,
+        'winning_trades': winning_trades,
+        'losing_trades': losing_trades,
+        'win_rate': win_rate,
+        'strategy_return': strategy_return,
+        'sharpe_ratio': sharpe_ratio
+    }
@@ -0,0 +1,319 @@
+import numpy as np
+import plotly.graph_objects as go
+from plotly.subplots import make_subplots
+from utils._njit import njit, NUMBA_AVAILABLE
+
+# Maximum number of points drawn per line trace on the price chart
+MAX_CHART_POINTS = 2000
+
+@njit(cache=True)
+def _lttb_indices(y, n_out):
+    """
+    Indices of the points kept by Largest-Triangle-Three-Buckets downsampling.
+
+    Points are taken as evenly spaced on the x axis. The first and last points
+    are always kept; from each bucket in between, the point forming the largest
+    triangle with the previously kept point and the next bucket's average is kept.
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0] = 0
+    out[n_out - 1] = n - 1
+    bucket_size = (n - 2) / (n_out - 2)
+    previous = 0
+    for bucket in range(n_out - 2):
+        start = int(bucket * bucket_size) + 1
+        end = int((bucket + 1) * bucket_size) + 1
+        next_end = min(int((bucket + 2) * bucket_size) + 1, n)
+        
+        # Average point of the next bucket
+        avg_x = 0.0
+        avg_y = 0.0
+        for j in range(end, next_end):
+            avg_x += j
+            avg_y += y[j]
+        avg_x /= next_end - end
+        avg_y /= next_end - end
+        
+        max_area = -1.0
+        chosen = start
+        for j in range(start, end):
+            area = abs((previous - avg_x) * (y[j] - y[previous]) - (previous - j) * (avg_y - y[previous]))
+            if area > max_area:
+                max_area = area
+                chosen = j
+        out[bucket + 1] = chosen
+        previous = chosen
+    return out
+
+def warm_up_kernels():
+    """Compile the downsampling kernel by running it once on a small series."""
+    if not NUMBA_AVAILABLE:
+        return
+    _lttb_indices(np.linspace(1.0, 2.0, 64), 8)
+
+def downsample_series(x, y, max_points=MAX_CHART_POINTS):
+    """
+    Reduce a line's points with LTTB when the series is long.
+
+    Unlike a fixed stride, LTTB keeps the peaks and troughs that define the
+    line's visual shape.
+
+    Args:
+        x (array-like): The line's x values.
+        y (array-like): The line's y values.
+        max_points (int): Maximum number of points to keep.
+
+    Returns:
+        dict: The trace's x and y data.
+    """
+    if len(y) <= max_points:
+        return dict(x=x, y=y)
+    y = np.asarray(y, dtype=np.float64)
+    keep = _lttb_indices(y, max_points)
+    return dict(x=x[keep], y=y[keep])
+
+def downsample_line(df, column, max_points=MAX_CHART_POINTS):
+    """
+    Data for a line trace drawn from a DataFrame column, reduced with LTTB.
+
+    Args:
+        df (pandas.DataFrame): DataFrame holding the series.
+        column (str): Column to draw.
+        max_points (int): Maximum number of points to keep.
+
+    Returns:
+        dict: The trace's x and y data.
+    """
+    return downsample_series(df.index, df[column], max_points)
+
+def _bar_groups(n, max_points):
+    """Start index of each run of consecutive bars merged into one chart bar."""
+    group_size = -(-n // max_points)
+    return np.arange(0, n, group_size)
+
+def downsample_ohlc(df, max_points=MAX_CHART_POINTS):
+    """
+    Data for a candlestick trace, merging consecutive bars when the series is long.
+
+    Each group of bars becomes one candle with the group's first open, highest
+    high, lowest low and last close, drawn at the group's first timestamp.
+
+    Args:
+        df (pandas.DataFrame): DataFrame with Open, High, Low and Close columns.
+        max_points (int): Maximum number of candles to keep.
+
+    Returns:
+        dict: The trace's x, open, high, low and close data.
+    """
+    if len(df) <= max_points:
+        return dict(x=df.index, open=df['Open'], high=df['High'], low=df['Low'], close=df['Close'])
+    starts = _bar_groups(len(df), max_points)
+    ends = np.append(starts[1:], len(df)) - 1
+    return dict(x=df.index[starts],
+                open=df['Open'].to_numpy()[starts],
+                high=np.maximum.reduceat(df['High'].to_numpy(), starts),
+                low=np.minimum.reduceat(df['Low'].to_numpy(), starts),
+                close=df['Close'].to_numpy()[ends])
+
+def downsample_bars(df, column, max_points=MAX_CHART_POINTS):
+    """
+    Data for a bar trace, averaging the same groups of bars that downsample_ohlc merges.
+
+    Unlike LTTB, which keeps only shape-significant points of a line, every
+    group yields one bar, so the bars stay evenly spaced and aligned with the candles.
+
+    Args:
+        df (pandas.DataFrame): DataFrame holding the series.
+        column (str): Column to draw.
+        max_points (int): Maximum number of bars to keep.
+
+    Returns:
+        dict: The trace's x and y data.
+    """
+    if len(df) <= max_points:
+        return dict(x=df.index, y=df[column])
+    starts = _bar_groups(len(df), max_points)
+    counts = np.diff(np.append(starts, len(df)))
+    values = df[column].to_numpy(dtype=np.float64)
+    return dict(x=df.index[starts], y=np.add.reduceat(values, starts) / counts)
+
+def price_chart_data(df, short_ma, long_ma, position=None, max_points=MAX_CHART_POINTS):
+    """
+    Collect the data shown by each trace of the price chart.
+
+    Args:
+        df (pandas.DataFrame): The stock data DataFrame with indicators and signals.
+        short_ma (int): Period of the short moving average.
+        long_ma (int): Period of the long moving average.
+        position (dict): Open portfolio position for the stock, if any.
+        max_points (int): Maximum number of candles and of points per line overlay.
+
+    Returns:
+        dict: Trace name mapped to that trace's data properties, in drawing order.
+    """
+    # Candles and line overlays are reduced to roughly the chart's pixel width
+    data = {
+        'Price': downsample_ohlc(df, max_points),
+        f"{short_ma}-period MA": downsample_line(df, f'MA_{short_ma}', max_points),
+        f"{long_ma}-period MA": downsample_line(df, f'MA_{long_ma}', max_points),
+        'BB Upper': downsample_line(df, 'BB_upper', max_points),
+        'BB Middle': downsample_line(df, 'BB_middle', max_points),
+        'BB Lower': downsample_line(df, 'BB_lower', max_points)
+    }
+
+    # Horizontal line at the position price
+    if position is not None:
+        position_type = position.get('position_type', 'LONG')
+        name = f"{position_type} Position ({position['quantity']} shares)"
+        data[name] = dict(x=[df.index[0], df.index[-1]], y=[position['avg_price'], position['avg_price']])
+
+    # Buy/sell signal markers, masking only the arrays the markers need. Both
+    # traces always exist (hidden from the legend when empty) so a new signal
+    # can be drawn by updating the chart rather than rebuilding it
+    signal = df['signal'].to_numpy()
+    buy_mask = signal == 1
+    sell_mask = signal == -1
+    data['Buy Signal'] = dict(x=df.index.to_numpy()[buy_mask],
+                              y=df['Low'].to_numpy()[buy_mask] * 0.99,  # Slightly below the low price
+                              showlegend=bool(buy_mask.any()))
+    data['Sell Signal'] = dict(x=df.index.to_numpy()[sell_mask],
+                               y=df['High'].to_numpy()[sell_mask] * 1.01,  # Slightly above the high price
+                               showlegend=bool(sell_mask.any()))
+
+    data['RSI'] = downsample_line(df, 'RSI', max_points)
+    data['MACD'] = downsample_line(df, 'MACD', max_points)
+    data['MACD Signal'] = downsample_line(df, 'MACD_signal', max_points)
+    data['MACD Histogram'] = downsample_bars(df, 'MACD_hist', max_points)
+
+    return data
+
+def build_price_chart(df, ticker, interval, short_ma, long_ma, rsi_overbought, rsi_oversold,
+                      currency_symbol, position=None):
+    """
+    Build the candlestick chart with indicator, RSI and MACD subplots.
+
+    Args:
+        df (pandas.DataFrame): The stock data DataFrame with indicators and signals.
+        ticker (str): Stock ticker symbol.
+        interval (str): Data interval shown in the title.
+        short_ma (int): Period of the short moving average.
+        long_ma (int): Period of the long moving average.
+        rsi_overbought (int): RSI overbought threshold.
+        rsi_oversold (int): RSI oversold threshold.
+        currency_symbol (str): Currency symbol for the price axis.
+        position (dict): Open portfolio position for the stock, if any.
+
+    Returns:
+        plotly.graph_objects.Figure: The price chart.
+    """
+    data = price_chart_data(df, short_ma, long_ma, position)
+
+    # Create subplot with shared x-axis
+    fig = make_subplots(rows=3, cols=1, shared_xaxes=True,
+                        row_heights=[0.6, 0.2, 0.2],
+                        vertical_spacing=0.05)
+
+    # Add candlestick chart
+    fig.add_trace(go.Candlestick(name="Price", **data['Price']), row=1, col=1)
+
+    # Line overlays are drawn with WebGL, which stays fast at thousands of points
+
+    # Add moving averages
+    fig.add_trace(go.Scattergl(name=f"{short_ma}-period MA", line=dict(color='blue'), **data[f"{short_ma}-period MA"]), row=1, col=1)
+    fig.add_trace(go.Scattergl(name=f"{long_ma}-period MA", line=dict(color='orange'), **data[f"{long_ma}-period MA"]), row=1, col=1)
+
+    # Add Bollinger Bands
+    fig.add_trace(go.Scattergl(name='BB Upper', line=dict(color='rgba(0,128,0,0.3)'), **data['BB Upper']), row=1, col=1)
+    fig.add_trace(go.Scattergl(name='BB Middle', line=dict(color='rgba(0,128,0,0.5)'), **data['BB Middle']), row=1, col=1)
+    fig.add_trace(go.Scattergl(name='BB Lower', line=dict(color='rgba(0,128,0,0.3)'), **data['BB Lower']), row=1, col=1)
+
+    # Add trade position if in portfolio
+    if position is not None:
+        position_type = position.get('position_type', 'LONG')
+        name = f"{position_type} Position ({position['quantity']} shares)"
+        fig.add_trace(
+            go.Scatter(mode='lines', line=dict(color='purple', width=2, dash='dash'), name=name, **data[name]),
+            row=1, col=1
+        )
+
+    # Add buy/sell signals
+    fig.add_trace(
+        go.Scatter(mode='markers', marker=dict(symbol='triangle-up', size=15, color='green'),
+                   name='Buy Signal', **data['Buy Signal']),
+        row=1, col=1
+    )
+    fig.add_trace(
+        go.Scatter(mode='markers', marker=dict(symbol='triangle-down', size=15, color='red'),
+                   name='Sell Signal', **data['Sell Signal']),
+        row=1, col=1
+    )
+
+    # Add RSI
+    fig.add_trace(go.Scattergl(name='RSI', line=dict(color='purple'), **data['RSI']), row=2, col=1)
+
+    # Add RSI overbought/oversold lines as shapes rather than full-length traces
+    fig.add_hline(y=rsi_overbought, line=dict(color='red', dash='dash'),
+                  annotation_text='Overbought', row=2, col=1)
+    fig.add_hline(y=rsi_oversold, line=dict(color='green', dash='dash'),
+                  annotation_text='Oversold', row=2, col=1)
+
+    # Add MACD
+    fig.add_trace(go.Scattergl(name='MACD', line=dict(color='blue'), **data['MACD']), row=3, col=1)
+    fig.add_trace(go.Scattergl(name='MACD Signal', line=dict(color='red'), **data['MACD Signal']), row=3, col=1)
+    fig.add_trace(go.Bar(name='MACD Histogram', marker=dict(color='gray'), **data['MACD Histogram']), row=3, col=1)
+
+    # Update layout
+    fig.update_layout(
+        title=f"{ticker} - {interval} interval",
+        xaxis_title="Date",
+        yaxis_title=f"Price ({currency_symbol})",
+        height=800,
+        # Keep the user's zoom and pan across reruns until the stock or interval changes
+        uirevision=f"{ticker}-{interval}",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        )
+    )
+
+    # Update y-axis titles for subplots
+    fig.update_yaxes(title_text=f"Price ({currency_symbol})", row=1, col=1)
+    fig.update_yaxes(title_text="RSI", row=2, col=1)
+    fig.update_yaxes(title_text="MACD", row=3, col=1)
+
+    return fig
+
+def update_price_chart(fig, df, short_ma, long_ma, position=None):
+    """
+    Update the data of an existing price chart in place.
+
+    Only trace data is replaced; styling and layout are kept. The update is
+    skipped when the set of traces differs (e.g. a position was opened or
+    closed), in which case the chart must be rebuilt.
+
+    Args:
+        fig (plotly.graph_objects.Figure): Chart created by build_price_chart.
+        df (pandas.DataFrame): The stock data DataFrame with indicators and signals.
+        short_ma (int): Period of the short moving average.
+        long_ma (int): Period of the long moving average.
+        position (dict): Open portfolio position for the stock, if any.
+
+    Returns:
+        bool: True if the chart was updated, False if it needs to be rebuilt.
+    """
+    data = price_chart_data(df, short_ma, long_ma, position)
+
+    if [trace.name for trace in fig.data] != list(data):
+        return False
+
+    with fig.batch_update():
+        for trace in fig.data:
+            trace.update(data[trace.name])
+
+    return True
@@ -1,6 +1,10 @@
+import asyncio
 import yfinance as yf
 import pandas as pd
+import numpy as np
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+import threading
 import time
 
 # Cache of popular stocks
@@ -17,6 +21,15 @@ POPULAR_STOCKS = {
     "WMT": "Walmart Inc."
 }
 
+# Lowercase ticker or company name mapped to its ticker, for exact-match suggestions
+_EXACT_LOOKUP = {
+    **{name.lower(): ticker for ticker, name in POPULAR_STOCKS.items()},
+    **{ticker.lower(): ticker for ticker in POPULAR_STOCKS}
+}
+
+# (ticker, name) pairs suggested when there is no search term yet
+TOP_POPULAR_STOCKS = tuple(POPULAR_STOCKS.items())[:10]
+
 def sanitize_ticker(ticker):
     """Sanitize ticker input to handle various formats."""
     if not ticker:
@@ -40,6 +53,25 @@ def sanitize_ticker(ticker):
     except Exception:
         return None
 
+def _prepare_history(data):
+    """Add the close percentage change and move the timestamps into a column."""
+    # Keep the exchange's local wall time without the timezone, so frames from
+    # the single and the batched fetch line up whatever exchange they are on
+    if getattr(data.index, 'tz', None) is not None:
+        data.index = data.index.tz_localize(None)
+
+    # Calculate percentage change in one pass over the close array
+    close = data['Close'].to_numpy(dtype=np.float64)
+    pct_change = np.empty_like(close)
+    if len(close):
+        pct_change[0] = np.nan
+    with np.errstate(divide='ignore', invalid='ignore'):
+        pct_change[1:] = (close[1:] - close[:-1]) / close[:-1] * 100.0
+    data['Close_pct_change'] = pct_change
+
+    # Reset index to make datetime a column
+    return data.reset_index()
+
 def fetch_stock_data(ticker, period="1d", interval="1m"):
     """
     Fetch stock data from Yahoo Finance with improved error handling.
@@ -74,12 +106,7 @@ def fetch_stock_data(ticker, period="1d", interval="1m"):
                     st.warning(f"No data available for {ticker}")
                     return None
 
-                # Calculate percentage change
-                data['Close_pct_change'] = data['Close'].pct_change() * 100
-
-                # Reset index to make datetime a column
-                data = data.reset_index()
-                return data
+                return _prepare_history(data)
 
             except Exception as e:
                 if attempt < max_retries - 1:
@@ -92,19 +119,114 @@ def fetch_stock_data(ticker, period="1d", interval="1m"):
         st.error(f"Critical error processing {ticker}: {str(e)}")
         return None
 
+def fetch_latest_bars(ticker, interval="1m"):
+    """
+    Fetch only the most recent bars for a ticker.
+
+    Used to extend already loaded history instead of downloading the whole
+    period again.
+
+    Args:
+        ticker (str): Stock ticker symbol
+        interval (str): Data interval (e.g., '1m', '5m', '15m', '30m', '60m', '1d')
+
+    Returns:
+        pandas.DataFrame or None: DataFrame with the latest bars or None if error
+    """
+    # A one day window holds a single daily bar, so look back a little further
+    period = "5d" if interval == "1d" else "1d"
+    return fetch_stock_data(ticker, period=period, interval=interval)
+
+async def _fetch_all_async(tickers, period, interval, fetch):
+    """Run the blocking fetch for every ticker in worker threads and gather the results."""
+    # Worker threads get the caller's script context so the fetch's st.warning
+    # and st.error messages still reach the page
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def fetch_in_context(ticker):
+        add_script_run_ctx(threading.current_thread(), ctx)
+        return fetch(ticker, period, interval)
+
+    results = await asyncio.gather(
+        *(asyncio.to_thread(fetch_in_context, ticker) for ticker in tickers),
+        return_exceptions=True
+    )
+    return {
+        ticker: (None if isinstance(result, Exception) else result)
+        for ticker, result in zip(tickers, results)
+    }
+
+def fetch_watchlist_data(tickers, period="1d", interval="1m", fetch=fetch_stock_data):
+    """
+    Fetch stock data for several tickers concurrently.
+
+    Args:
+        tickers (list): Stock ticker symbols
+        period (str): Data period (e.g., '1d', '5d', '1mo', '3mo', '1y')
+        interval (str): Data interval (e.g., '1m', '5m', '15m', '30m', '60m', '1d')
+        fetch (callable): Fetch function called as fetch(ticker, period, interval)
+
+    Returns:
+        dict: Mapping of ticker to DataFrame (or None if the fetch failed)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    return asyncio.run(_fetch_all_async(tickers, period, interval, fetch))
+
+def fetch_stock_data_batch(tickers, period="1d", interval="1m"):
+    """
+    Fetch stock data for several tickers with a single Yahoo Finance request.
+
+    Tickers missing from the batched response are fetched individually.
+
+    Args:
+        tickers (list): Stock ticker symbols
+        period (str): Data period (e.g., '1d', '5d', '1mo', '3mo', '1y')
+        interval (str): Data interval (e.g., '1m', '5m', '15m', '30m', '60m', '1d')
+
+    Returns:
+        dict: Mapping of ticker to DataFrame (or None if the fetch failed)
+    """
+    tickers = list(dict.fromkeys(str(ticker).strip().upper() for ticker in tickers))
+    if not tickers:
+        return {}
+
+    results = {}
+    try:
+        data = yf.download(tickers, period=period, interval=interval, group_by='ticker',
+                           actions=True, ignore_tz=True, threads=True, progress=False)
+        if data is not None and not data.empty:
+            available = set(data.columns.get_level_values(0))
+            for ticker in tickers:
+                if ticker in available:
+                    # Rows where only other tickers traded are all NaN for this one
+                    history = data[ticker].dropna(how='all')
+                    if not history.empty:
+                        history = history.copy()
+                        history.columns.name = None
+                        results[ticker] = _prepare_history(history)
+    except Exception:
+        # Fall back to fetching every ticker on its own
+        results = {}
+
+    missing = [ticker for ticker in tickers if ticker not in results]
+    if missing:
+        results.update(fetch_watchlist_data(missing, period=period, interval=interval))
+    return results
+
 def get_stock_suggestions(search_term):
     """Get stock suggestions based on search term."""
     try:
         if not search_term:
-            return dict(list(POPULAR_STOCKS.items())[:10])
+            return dict(TOP_POPULAR_STOCKS)
 
         search_term = str(search_term).lower().strip()
         
         # First try exact matches
-        exact_matches = {k: v for k, v in POPULAR_STOCKS.items() 
-                        if search_term == k.lower() or search_term == v.lower()}
-        if exact_matches:
-            return exact_matches
+        if search_term in _EXACT_LOOKUP:
+            ticker = _EXACT_LOOKUP[search_term]
+            return {ticker: POPULAR_STOCKS[ticker]}
 
         # Then try partial matches
         partial_matches = {k: v for k, v in POPULAR_STOCKS.items() 
@@ -126,15 +248,3 @@ def get_stock_suggestions(search_term):
     except Exception as e:
         print(f"Error in get_stock_suggestions: {str(e)}")
         return {}
-
-def get_available_stocks(search_term):
-    """Get list of available stock tickers."""
-    try:
-        if not search_term:
-            return list(POPULAR_STOCKS.keys())[:10]
-
-        suggestions = get_stock_suggestions(search_term)
-        return list(suggestions.keys())
-
-    except Exception:
-        return []
\ No newline at end of file
@@ -205,7 +205,7 @@ def load_portfolio(user_id=None, db=None):
             db.close()
 
 def save_portfolio(portfolio, user_id=None, db=None):
-    """Save portfolio data to database."""
+    """Save portfolio data to database, replacing the positions saved before."""
     close_db = False
     if db is None:
         db = SessionLocal()
@@ -1,5 +1,162 @@
 import pandas as pd
 import numpy as np
+from utils._njit import njit, NUMBA_AVAILABLE
+
+@njit(cache=True, nogil=True)
+def _ema(values, span, seed=np.nan):
+    """
+    Exponential moving average matching pandas ewm(span=span, adjust=False).
+
+    A non-NaN seed is taken as the EMA of the bar before values[0], which
+    lets an existing series be continued with new bars.
+    """
+    n = len(values)
+    out = np.empty(n)
+    if n == 0:
+        return out
+    alpha = 2.0 / (span + 1.0)
+    if np.isnan(seed):
+        out[0] = values[0]
+    else:
+        out[0] = alpha * values[0] + (1.0 - alpha) * seed
+    for i in range(1, n):
+        out[i] = alpha * values[i] + (1.0 - alpha) * out[i - 1]
+    return out
+
+@njit(cache=True, nogil=True)
+def _indicator_pass(close, short_ma, long_ma, rsi_period, macd_fast, macd_slow, macd_signal, bb_period):
+    """
+    All close-based indicators in a single sweep over the prices.
+    
+    Moving averages use a running sum, the Bollinger standard deviation
+    (ddof=1) a sliding Welford update and RSI simple moving averages of
+    gains and losses; the first window-1 values of each are NaN. Each price
+    is read once and the running sums stay in local variables instead of
+    intermediate arrays.
+    
+    Returns:
+        tuple: Short MA, long MA, RSI, fast EMA, slow EMA, MACD signal line,
+            Bollinger middle band and Bollinger standard deviation arrays.
+    """
+    n = len(close)
+    ma_short = np.full(n, np.nan)
+    ma_long = np.full(n, np.nan)
+    rsi = np.full(n, np.nan)
+    ema_fast = np.empty(n)
+    ema_slow = np.empty(n)
+    signal_line = np.empty(n)
+    bb_middle = np.full(n, np.nan)
+    bb_std = np.full(n, np.nan)
+    
+    alpha_fast = 2.0 / (macd_fast + 1.0)
+    alpha_slow = 2.0 / (macd_slow + 1.0)
+    alpha_signal = 2.0 / (macd_signal + 1.0)
+    short_total = 0.0
+    long_total = 0.0
+    bb_total = 0.0
+    gain_total = 0.0
+    loss_total = 0.0
+    bb_mean = 0.0
+    bb_m2 = 0.0
+    
+    for i in range(n):
+        price = close[i]
+        
+        # Simple moving averages: V[t] = V[t-1] + (S[t] - S[t-w]) / w
+        if i < short_ma:
+            short_total += price
+        else:
+            short_total += price - close[i - short_ma]
+        if i >= short_ma - 1:
+            ma_short[i] = short_total / short_ma
+        if i < long_ma:
+            long_total += price
+        else:
+            long_total += price - close[i - long_ma]
+        if i >= long_ma - 1:
+            ma_long[i] = long_total / long_ma
+        if i < bb_period:
+            bb_total += price
+        else:
+            bb_total += price - close[i - bb_period]
+        if i >= bb_period - 1:
+            bb_middle[i] = bb_total / bb_period
+        
+        # Bollinger standard deviation with a sliding Welford update
+        if bb_period >= 2:
+            if i < bb_period:
+                delta = price - bb_mean
+                bb_mean += delta / (i + 1)
+                bb_m2 += delta * (price - bb_mean)
+            else:
+                old = close[i - bb_period]
+                new_mean = bb_mean + (price - old) / bb_period
+                bb_m2 += (price - old) * (price - new_mean + old - bb_mean)
+                bb_mean = new_mean
+            if i >= bb_period - 1:
+                bb_std[i] = np.sqrt(max(bb_m2, 0.0) / (bb_period - 1))
+        
+        # RSI from simple moving averages of gains and losses
+        gain = 0.0
+        loss = 0.0
+        if i > 0:
+            delta = price - close[i - 1]
+            if delta > 0:
+                gain = delta
+            elif delta < 0:
+                loss = -delta
+        if i < rsi_period:
+            gain_total += gain
+            loss_total += loss
+        else:
+            j = i - rsi_period
+            old_gain = 0.0
+            old_loss = 0.0
+            if j > 0:
+                delta = close[j] - close[j - 1]
+                if delta > 0:
+                    old_gain = delta
+                elif delta < 0:
+                    old_loss = -delta
+            gain_total += gain - old_gain
+            loss_total += loss - old_loss
+        if i >= rsi_period - 1:
+            avg_gain = gain_total / rsi_period
+            avg_loss = loss_total / rsi_period
+            if avg_loss == 0.0:
+                # Only gains gives RSI 100; no movement at all is undefined
+                if avg_gain > 0.0:
+                    rsi[i] = 100.0
+            else:
+                rsi[i] = 100.0 - (100.0 / (1.0 + avg_gain / avg_loss))
+        
+        # EMAs behind MACD, matching pandas ewm(adjust=False)
+        if i == 0:
+            ema_fast[i] = price
+            ema_slow[i] = price
+            signal_line[i] = 0.0  # Both EMAs start at the first price, so MACD starts at 0
+        else:
+            ema_fast[i] = alpha_fast * price + (1.0 - alpha_fast) * ema_fast[i - 1]
+            ema_slow[i] = alpha_slow * price + (1.0 - alpha_slow) * ema_slow[i - 1]
+            macd = ema_fast[i] - ema_slow[i]
+            signal_line[i] = alpha_signal * macd + (1.0 - alpha_signal) * signal_line[i - 1]
+    
+    return ma_short, ma_long, rsi, ema_fast, ema_slow, signal_line, bb_middle, bb_std
+
+def warm_up_kernels():
+    """
+    Compile the indicator kernels by running them once on a small series.
+
+    With numba, compilation takes a few seconds on a cold start (or is a
+    disk cache load afterwards); running this off the request path keeps
+    that out of the first analysis.
+    """
+    if not NUMBA_AVAILABLE:
+        return
+    values = np.linspace(1.0, 2.0, 64)
+    _ema(values, 5)
+    _ema(values, 5, values[0])
+    _indicator_pass(values, 5, 10, 5, 3, 6, 2, 5)
 
 def calculate_indicators(df, short_ma=20, long_ma=50, rsi_period=14, 
                         macd_fast=12, macd_slow=26, macd_signal=9,
@@ -24,6 +181,37 @@ def calculate_indicators(df, short_ma=20, long_ma=50, rsi_period=14,
     # Make a copy to avoid SettingWithCopyWarning
     dataframe = df.copy()
     
+    close = dataframe['Close'].to_numpy(dtype=np.float64)
+    if NUMBA_AVAILABLE and not np.isnan(close).any():
+        # One compiled pass over the raw close prices; gaps in the data take
+        # the pandas path below, which skips NaN values
+        (ma_short, ma_long, rsi, ema_fast, ema_slow, macd_signal_line,
+         bb_middle, bb_std_values) = _indicator_pass(close, short_ma, long_ma, rsi_period,
+                                                     macd_fast, macd_slow, macd_signal, bb_period)
+        macd = ema_fast - ema_slow
+        
+        indicator_columns = {
+            'EMA_fast': ema_fast,
+            'EMA_slow': ema_slow,
+            f'MA_{short_ma}': ma_short,
+            f'MA_{long_ma}': ma_long,
+            'RSI': rsi,
+            'MACD': macd,
+            'MACD_signal': macd_signal_line,
+            'MACD_hist': macd - macd_signal_line,
+            'BB_middle': bb_middle,
+            'BB_std': bb_std_values,
+            'BB_upper': bb_middle + (bb_std_values * bb_std),
+            'BB_lower': bb_middle - (bb_std_values * bb_std)
+        }
+        for column, values in indicator_columns.items():
+            dataframe[column] = values
+        
+        # Fill NaN values with 0
+        dataframe.fillna(0, inplace=True)
+        
+        return dataframe
+    
     # Moving Averages
     dataframe[f'MA_{short_ma}'] = dataframe['Close'].rolling(window=short_ma).mean()
     dataframe[f'MA_{long_ma}'] = dataframe['Close'].rolling(window=long_ma).mean()
@@ -39,6 +227,8 @@ def calculate_indicators(df, short_ma=20, long_ma=50, rsi_period=14,
     # MACD
     ema_fast = dataframe['Close'].ewm(span=macd_fast, adjust=False).mean()
     ema_slow = dataframe['Close'].ewm(span=macd_slow, adjust=False).mean()
+    dataframe['EMA_fast'] = ema_fast
+    dataframe['EMA_slow'] = ema_slow
     dataframe['MACD'] = ema_fast - ema_slow
     dataframe['MACD_signal'] = dataframe['MACD'].ewm(span=macd_signal, adjust=False).mean()
     dataframe['MACD_hist'] = dataframe['MACD'] - dataframe['MACD_signal']
@@ -54,6 +244,99 @@ def calculate_indicators(df, short_ma=20, long_ma=50, rsi_period=14,
     
     return dataframe
 
+def update_indicators(df, new_bars, short_ma=20, long_ma=50, rsi_period=14,
+                      macd_fast=12, macd_slow=26, macd_signal=9,
+                      bb_period=20, bb_std=2.0):
+    """
+    Extend a DataFrame from calculate_indicators with newly fetched bars.
+    
+    Bars in df at or after the first new timestamp are replaced (the last bar
+    of the previous fetch is usually still forming). Rolling indicators are
+    recomputed over the new bars plus one window of history, and the EMAs
+    behind MACD continue from their last stored values, so the work grows
+    with the number of new bars rather than the length of the history. The
+    oldest bars are dropped to keep the window length unchanged.
+    
+    Args:
+        df (pandas.DataFrame): DataFrame returned by calculate_indicators
+            with the same parameters.
+        new_bars (pandas.DataFrame): Recent bars from fetch_stock_data.
+        short_ma (int): Period for short moving average.
+        long_ma (int): Period for long moving average.
+        rsi_period (int): Period for RSI calculation.
+        macd_fast (int): Fast period for MACD.
+        macd_slow (int): Slow period for MACD.
+        macd_signal (int): Signal period for MACD.
+        bb_period (int): Period for Bollinger Bands calculation.
+        bb_std (float): Standard deviation multiplier for Bollinger Bands.
+        
+    Returns:
+        pandas.DataFrame: The extended DataFrame with calculated indicators.
+    """
+    params = dict(short_ma=short_ma, long_ma=long_ma, rsi_period=rsi_period,
+                  macd_fast=macd_fast, macd_slow=macd_slow, macd_signal=macd_signal,
+                  bb_period=bb_period, bb_std=bb_std)
+    raw_columns = list(new_bars.columns)
+    indicator_columns = ['EMA_fast', 'EMA_slow', f'MA_{short_ma}', f'MA_{long_ma}', 'RSI',
+                         'MACD', 'MACD_signal', 'MACD_hist',
+                         'BB_middle', 'BB_std', 'BB_upper', 'BB_lower']
+    
+    # The first column holds the bar timestamps after fetch_stock_data's reset_index
+    time_column = raw_columns[0]
+    keep = int((df[time_column] < new_bars[time_column].iloc[0]).sum())
+    warmup = max(short_ma, long_ma, bb_period, rsi_period + 1)
+    
+    new_close = new_bars['Close'].to_numpy(dtype=np.float64)
+    if (keep < warmup or any(column not in df.columns for column in indicator_columns)
+            or np.isnan(new_close).any()):
+        # Not enough compatible history to continue from; recompute everything
+        merged = pd.concat([df.iloc[:keep][raw_columns], new_bars], ignore_index=True)
+        return calculate_indicators(merged, **params)
+    
+    dataframe = pd.concat([df.iloc[:keep][raw_columns + indicator_columns], new_bars],
+                          ignore_index=True)
+    close = dataframe['Close'].to_numpy(dtype=np.float64)
+    
+    # The first new bar's change is relative to the last kept bar
+    pct_change = dataframe['Close_pct_change'].to_numpy(copy=True)
+    pct_change[keep] = (close[keep] - close[keep - 1]) / close[keep - 1] * 100
+    dataframe['Close_pct_change'] = pct_change
+    
+    # Rolling windows only need the bars that fall inside them
+    tail = close[keep - warmup + 1:]
+    ema_fast = _ema(new_close, macd_fast, df['EMA_fast'].iloc[keep - 1])
+    ema_slow = _ema(new_close, macd_slow, df['EMA_slow'].iloc[keep - 1])
+    macd = ema_fast - ema_slow
+    macd_signal_line = _ema(macd, macd_signal, df['MACD_signal'].iloc[keep - 1])
+    # The pass restarts its EMAs at the first tail price, so only its
+    # window-based outputs are used here
+    ma_short, ma_long, rsi, _, _, _, bb_middle, bb_std_values = (
+        array[warmup - 1:] for array in _indicator_pass(
+            tail, short_ma, long_ma, rsi_period, macd_fast, macd_slow, macd_signal, bb_period))
+    
+    tail_columns = {
+        'EMA_fast': ema_fast,
+        'EMA_slow': ema_slow,
+        f'MA_{short_ma}': ma_short,
+        f'MA_{long_ma}': ma_long,
+        'RSI': rsi,
+        'MACD': macd,
+        'MACD_signal': macd_signal_line,
+        'MACD_hist': macd - macd_signal_line,
+        'BB_middle': bb_middle,
+        'BB_std': bb_std_values,
+        'BB_upper': bb_middle + (bb_std_values * bb_std),
+        'BB_lower': bb_middle - (bb_std_values * bb_std)
+    }
+    for column, values in tail_columns.items():
+        dataframe.loc[keep:, column] = values
+    
+    # Fill NaN values with 0
+    dataframe.fillna(0, inplace=True)
+    
+    # Keep the same window length as the original fetch
+    return dataframe.iloc[-max(len(df), len(new_bars)):].reset_index(drop=True)
+
 def calculate_atr(df, period=14):
     """
     Calculate Average True Range (ATR) for risk management.
@@ -3,31 +3,40 @@ import numpy as np
 import datetime
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor
 import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
 from utils.data_fetcher import fetch_stock_data
 from utils.indicators import calculate_indicators
 from utils.signal_generator import generate_signals, calculate_composite_score
 from utils.risk_manager import calculate_risk_parameters
 from utils.alert_manager import send_trading_signal_alert, notify_app_alert
 
+# Maximum number of stocks analyzed at the same time when monitoring a watchlist
+MAX_ANALYSIS_WORKERS = 8
+
 class RealTimeAnalyzer:
     """
     Class to handle real-time stock analysis and generating trading signals
     """
     
-    def __init__(self, interval="1m", lookback_period="1d"):
+    def __init__(self, interval="1m", lookback_period="1d", fetch=fetch_stock_data):
         """
         Initialize the real-time analyzer
         
         Args:
             interval (str): Data interval for analysis (default: 1m)
             lookback_period (str): Period to look back for historical data (default: 1d)
+            fetch (callable): Function used to fetch stock data, e.g. a cached
+                wrapper around fetch_stock_data (default: fetch_stock_data)
         """
         self.interval = interval
         self.lookback_period = lookback_period
+        self.fetch = fetch
         self.monitoring_thread = None
         self.stop_event = threading.Event()
         self.last_signal_time = {}  # To track when last signal was generated for each stock
+        self.analysis_cache = {}  # Latest analyzed frame for each stock, with the inputs it came from
         self.monitoring_active = False
         
     def analyze_stock(self, ticker, indicator_settings):
@@ -43,36 +52,48 @@ class RealTimeAnalyzer:
         """
         try:
             # Fetch latest data
-            df = fetch_stock_data(ticker, period=self.lookback_period, interval=self.interval)
+            df = self.fetch(ticker, period=self.lookback_period, interval=self.interval)
             
             if df is None or df.empty:
                 return None
                 
-            # Calculate indicators
-            df = calculate_indicators(
-                df,
-                short_ma=indicator_settings.get('short_ma', 20),
-                long_ma=indicator_settings.get('long_ma', 50),
-                rsi_period=indicator_settings.get('rsi_period', 14),
-                macd_fast=indicator_settings.get('macd_fast', 12),
-                macd_slow=indicator_settings.get('macd_slow', 26),
-                macd_signal=indicator_settings.get('macd_signal', 9),
-                bb_period=indicator_settings.get('bb_period', 20),
-                bb_std=indicator_settings.get('bb_std', 2)
-            )
-            
-            # Generate signals
-            df = generate_signals(
-                df,
-                rsi_overbought=indicator_settings.get('rsi_overbought', 70),
-                rsi_oversold=indicator_settings.get('rsi_oversold', 30)
-            )
-            
-            # Calculate composite score
-            df = calculate_composite_score(df)
+            # Reuse the previous analysis while the bars and settings are unchanged,
+            # keyed on the row count and last bar since the fetched frame is a fresh copy.
+            # The first column holds the bar timestamps; the close is compared as bytes
+            # so a still forming bar is picked up and a NaN close still matches
+            analysis_key = (len(df), df.iat[-1, 0], df['Close'].to_numpy()[-1:].tobytes(),
+                            tuple(sorted(indicator_settings.items())))
+            cached = self.analysis_cache.get(ticker)
+            if cached is not None and cached[0] == analysis_key:
+                df = cached[1]
+            else:
+                # Calculate indicators
+                df = calculate_indicators(
+                    df,
+                    short_ma=indicator_settings.get('short_ma', 20),
+                    long_ma=indicator_settings.get('long_ma', 50),
+                    rsi_period=indicator_settings.get('rsi_period', 14),
+                    macd_fast=indicator_settings.get('macd_fast', 12),
+                    macd_slow=indicator_settings.get('macd_slow', 26),
+                    macd_signal=indicator_settings.get('macd_signal', 9),
+                    bb_period=indicator_settings.get('bb_period', 20),
+                    bb_std=indicator_settings.get('bb_std', 2)
+                )
+                
+                # Generate signals
+                df = generate_signals(
+                    df,
+                    rsi_overbought=indicator_settings.get('rsi_overbought', 70),
+                    rsi_oversold=indicator_settings.get('rsi_oversold', 30)
+                )
+                
+                # Calculate composite score
+                df = calculate_composite_score(df)
+                self.analysis_cache[ticker] = (analysis_key, df)
             
-            # Calculate risk parameters for the latest data point
-            latest_data = df.iloc[-1]
+            # Calculate risk parameters for the latest data point, read as scalars
+            # from the column arrays rather than materializing the row as a Series
+            latest_data = {column: df[column].to_numpy()[-1] for column in df.columns}
             risk_params = calculate_risk_parameters(
                 latest_data,
                 df,
@@ -96,6 +117,45 @@ class RealTimeAnalyzer:
             st.error(f"Error analyzing {ticker}: {str(e)}")
             return None
     
+    def analyze_stocks(self, tickers, indicator_settings):
+        """
+        Analyze several stocks concurrently
+        
+        Fetching is network bound and the indicator kernels release the GIL,
+        so a thread pool overlaps both across the watchlist.
+        
+        Args:
+            tickers (list): Stock ticker symbols
+            indicator_settings (dict): Technical indicator settings
+            
+        Returns:
+            dict: Mapping of ticker to analysis results (or None if error)
+        """
+        tickers = list(dict.fromkeys(tickers))
+        if not tickers:
+            return {}
+        
+        # Worker threads get the caller's script context so st.error and the
+        # cached fetch behave as they do on the calling thread
+        ctx = get_script_run_ctx(suppress_warning=True)
+        
+        def analyze_in_context(ticker):
+            add_script_run_ctx(threading.current_thread(), ctx)
+            return self.analyze_stock(ticker, indicator_settings)
+        
+        with ThreadPoolExecutor(max_workers=min(len(tickers), MAX_ANALYSIS_WORKERS)) as executor:
+            results = executor.map(analyze_in_context, tickers)
+            return dict(zip(tickers, results))
+    
+    def forget(self, ticker):
+        """
+        Drop the cached analysis for a stock that left the watchlist
+        
+        Args:
+            ticker (str): Stock ticker symbol
+        """
+        self.analysis_cache.pop(ticker, None)
+    
     def _determine_real_time_signal(self, df, ticker):
         """
         Determine real-time trading signal based on the latest data
@@ -110,11 +170,16 @@ class RealTimeAnalyzer:
         if df.empty:
             return {'type': 'UNKNOWN', 'strength': 0, 'desc': 'No data available'}
             
+        # Columns compared between the latest and previous data points
+        ma_cols = [col for col in df.columns if col.startswith('MA_')]
+        columns = ['composite_score', 'signal', 'Close', 'MACD', 'MACD_signal'] + ma_cols
+        last_two = {column: df[column].to_numpy()[-2:] for column in columns}
+        
         # Get latest data point
-        latest = df.iloc[-1]
+        latest = {column: values[-1] for column, values in last_two.items()}
         
-        # Get previous data point for comparison (if available)
-        prev = df.iloc[-2] if len(df) > 1 else latest
+        # Get previous data point for comparison (the latest one if there is no other)
+        prev = {column: values[0] for column, values in last_two.items()}
         
         # Determine trading signal strength (composite score)
         score = latest['composite_score']
@@ -130,7 +195,6 @@ class RealTimeAnalyzer:
         macd_bearish_cross = (latest['MACD'] < latest['MACD_signal']) and (prev['MACD'] >= prev['MACD_signal'])
         
         # Check for recent crossover of moving averages
-        ma_cols = [col for col in df.columns if col.startswith('MA_')]
         if len(ma_cols) >= 2:
             short_ma_col = min(ma_cols, key=lambda x: int(x.split('_')[1]))
             long_ma_col = max(ma_cols, key=lambda x: int(x.split('_')[1]))
@@ -265,15 +329,15 @@ class RealTimeAnalyzer:
             alert_frequency (int): Minimum minutes between alerts for the same stock
         """
         while not self.stop_event.is_set():
-            for ticker in watchlist:
-                # Skip if the market is closed (simplified check for now)
-                now = datetime.datetime.now()
-                if now.hour < 9 or now.hour >= 16 or now.weekday() >= 5:  # Outside 9AM-4PM or weekend
-                    continue
-                    
-                # Analyze the stock
-                analysis = self.analyze_stock(ticker, indicator_settings)
-                
+            # Skip if the market is closed (simplified check for now)
+            now = datetime.datetime.now()
+            if now.hour < 9 or now.hour >= 16 or now.weekday() >= 5:  # Outside 9AM-4PM or weekend
+                analyses = {}
+            else:
+                # Analyze the whole watchlist at once
+                analyses = self.analyze_stocks(watchlist, indicator_settings)
+            
+            for ticker, analysis in analyses.items():
                 if analysis:
                     signal = analysis['signal']
                     
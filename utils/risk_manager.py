@@ -7,7 +7,7 @@ def calculate_risk_parameters(latest_data, historical_data, risk_percentage=1.0)
     Calculate risk management parameters including stop-loss and take-profit levels.
     
     Args:
-        latest_data (pandas.Series): The latest data point with calculated indicators.
+        latest_data (dict or pandas.Series): The latest data point with calculated indicators.
         historical_data (pandas.DataFrame): Historical data for additional calculations.
         risk_percentage (float): Risk percentage per trade (1.0 = 1%).
         
@@ -18,7 +18,7 @@ def calculate_risk_parameters(latest_data, historical_data, risk_percentage=1.0)
     entry_price = latest_data['Close']
     
     # Calculate ATR for volatility-based stop loss
-    atr = calculate_atr(historical_data).iloc[-1]
+    atr = calculate_atr(historical_data).to_numpy()[-1]
     
     # Calculate support/resistance levels
     support_resistance = calculate_support_resistance(historical_data)
@@ -32,8 +32,8 @@ def calculate_risk_parameters(latest_data, historical_data, risk_percentage=1.0)
         uptrend = short_ma > long_ma
     else:
         # Fallback if moving averages are not available
-        recent_data = historical_data.tail(10)
-        uptrend = recent_data['Close'].iloc[-1] > recent_data['Close'].iloc[0]
+        recent_close = historical_data['Close'].to_numpy()[-10:]
+        uptrend = recent_close[-1] > recent_close[0]
     
     # Set stop loss based on trend, volatility (ATR), and support/resistance
     if uptrend:
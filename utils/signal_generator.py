@@ -19,62 +19,83 @@ def generate_signals(df, rsi_overbought=70, rsi_oversold=30):
     # Initialize signal column with 0 (no signal)
     dataframe['signal'] = 0
     
+    # Work on the raw arrays; the first bar has no previous bar to cross from
+    def values(column):
+        return dataframe[column].to_numpy(dtype=np.float64)
+    
+    def previous(array, fill=np.nan):
+        shifted = np.empty_like(array)
+        shifted[:1] = fill
+        shifted[1:] = array[:-1]
+        return shifted
+    
+    def crossover_signal(bullish, bearish):
+        # 1 for bullish crossings, -1 for bearish ones (which take precedence)
+        return np.where(bearish, -1, np.where(bullish, 1, 0)).astype(np.int64)
+    
     # Moving Average Crossover
     ma_cols = [col for col in dataframe.columns if col.startswith('MA_')]
     if len(ma_cols) >= 2:
         # Get shortest and longest periods
         short_ma_col = min(ma_cols, key=lambda x: int(x.split('_')[1]))
         long_ma_col = max(ma_cols, key=lambda x: int(x.split('_')[1]))
+        short_ma, long_ma = values(short_ma_col), values(long_ma_col)
+        prev_short_ma, prev_long_ma = previous(short_ma), previous(long_ma)
         
         # Create crossover signals
         # 1 when short crosses above long (bullish), -1 when short crosses below long (bearish)
-        dataframe['ma_cross'] = 0
-        dataframe.loc[(dataframe[short_ma_col] > dataframe[long_ma_col]) & 
-                     (dataframe[short_ma_col].shift(1) <= dataframe[long_ma_col].shift(1)), 'ma_cross'] = 1
-        dataframe.loc[(dataframe[short_ma_col] < dataframe[long_ma_col]) & 
-                     (dataframe[short_ma_col].shift(1) >= dataframe[long_ma_col].shift(1)), 'ma_cross'] = -1
+        dataframe['ma_cross'] = crossover_signal(
+            (short_ma > long_ma) & (prev_short_ma <= prev_long_ma),
+            (short_ma < long_ma) & (prev_short_ma >= prev_long_ma)
+        )
     
     # RSI Signals
     if 'RSI' in dataframe.columns:
-        dataframe['rsi_signal'] = 0
-        # Oversold to normal - buy signal
-        dataframe.loc[(dataframe['RSI'] > rsi_oversold) & 
-                     (dataframe['RSI'].shift(1) <= rsi_oversold), 'rsi_signal'] = 1
-        # Overbought to normal - sell signal
-        dataframe.loc[(dataframe['RSI'] < rsi_overbought) & 
-                     (dataframe['RSI'].shift(1) >= rsi_overbought), 'rsi_signal'] = -1
+        rsi = values('RSI')
+        prev_rsi = previous(rsi)
+        # Oversold to normal - buy signal; overbought to normal - sell signal
+        dataframe['rsi_signal'] = crossover_signal(
+            (rsi > rsi_oversold) & (prev_rsi <= rsi_oversold),
+            (rsi < rsi_overbought) & (prev_rsi >= rsi_overbought)
+        )
     
     # MACD Signals
     if all(x in dataframe.columns for x in ['MACD', 'MACD_signal']):
-        dataframe['macd_cross'] = 0
-        # MACD crosses above signal line - buy signal
-        dataframe.loc[(dataframe['MACD'] > dataframe['MACD_signal']) & 
-                     (dataframe['MACD'].shift(1) <= dataframe['MACD_signal'].shift(1)), 'macd_cross'] = 1
-        # MACD crosses below signal line - sell signal
-        dataframe.loc[(dataframe['MACD'] < dataframe['MACD_signal']) & 
-                     (dataframe['MACD'].shift(1) >= dataframe['MACD_signal'].shift(1)), 'macd_cross'] = -1
+        macd, macd_signal = values('MACD'), values('MACD_signal')
+        prev_macd, prev_macd_signal = previous(macd), previous(macd_signal)
+        # MACD crosses above signal line - buy signal; below - sell signal
+        dataframe['macd_cross'] = crossover_signal(
+            (macd > macd_signal) & (prev_macd <= prev_macd_signal),
+            (macd < macd_signal) & (prev_macd >= prev_macd_signal)
+        )
     
     # Bollinger Bands Signals
     if all(x in dataframe.columns for x in ['BB_upper', 'BB_lower', 'Close']):
-        dataframe['bb_signal'] = 0
+        close, bb_upper, bb_lower = values('Close'), values('BB_upper'), values('BB_lower')
+        prev_close, prev_bb_upper, prev_bb_lower = previous(close), previous(bb_upper), previous(bb_lower)
+        
         # Price crosses below lower band and then back above - buy signal
-        below_lower = dataframe['Close'] < dataframe['BB_lower']
-        cross_back_above_lower = (dataframe['Close'] > dataframe['BB_lower']) & (dataframe['Close'].shift(1) <= dataframe['BB_lower'].shift(1))
-        dataframe.loc[below_lower.shift(1) & cross_back_above_lower, 'bb_signal'] = 1
+        below_lower = close < bb_lower
+        cross_back_above_lower = (close > bb_lower) & (prev_close <= prev_bb_lower)
         
         # Price crosses above upper band and then back below - sell signal
-        above_upper = dataframe['Close'] > dataframe['BB_upper']
-        cross_back_below_upper = (dataframe['Close'] < dataframe['BB_upper']) & (dataframe['Close'].shift(1) >= dataframe['BB_upper'].shift(1))
-        dataframe.loc[above_upper.shift(1) & cross_back_below_upper, 'bb_signal'] = -1
+        above_upper = close > bb_upper
+        cross_back_below_upper = (close < bb_upper) & (prev_close >= prev_bb_upper)
+        
+        dataframe['bb_signal'] = crossover_signal(
+            previous(below_lower, False) & cross_back_above_lower,
+            previous(above_upper, False) & cross_back_below_upper
+        )
     
     # Combine signals to generate overall trading signal
     # We'll use a simple approach here, but this can be made more sophisticated
     # If 2 or more indicators agree, we generate a signal
     signal_columns = [col for col in dataframe.columns if col.endswith('_signal') or col.endswith('_cross')]
     if signal_columns:
-        # Count positive and negative signals for each row
-        positive_signals = dataframe[signal_columns].apply(lambda row: sum(row > 0), axis=1)
-        negative_signals = dataframe[signal_columns].apply(lambda row: sum(row < 0), axis=1)
+        # Count positive and negative signals for each row in one pass over the array
+        signal_values = dataframe[signal_columns].to_numpy(dtype=np.float64)
+        positive_signals = np.count_nonzero(signal_values > 0, axis=1)
+        negative_signals = np.count_nonzero(signal_values < 0, axis=1)
         
         # Generate overall signal based on indicator agreement
         dataframe.loc[positive_signals >= 2, 'signal'] = 1  # Buy signal
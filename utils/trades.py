@@ -0,0 +1,92 @@
+import pandas as pd
+import numpy as np
+
+# Columns of a trade record, in display order
+TRADE_COLUMNS = ['ticker', 'action', 'position_type', 'quantity', 'price', 'value', 'fee',
+                 'pnl', 'pnl_percent', 'timestamp', 'confidence_score']
+
+def trades_to_frame(trades):
+    """
+    Build a typed DataFrame from a list of trade records.
+
+    Ticker, action and position type are stored as categories since they
+    repeat across trades. Money columns stay float64 so larger trade values
+    keep their cents.
+
+    Args:
+        trades (list): Trade records as stored in st.session_state.trades.
+
+    Returns:
+        pandas.DataFrame: One row per trade with the columns in TRADE_COLUMNS.
+    """
+    frame = pd.DataFrame.from_records(trades, columns=TRADE_COLUMNS)
+
+    # Only closed trades carry P&L; older records may lack a position type
+    frame['position_type'] = frame['position_type'].fillna('LONG')
+    frame[['pnl', 'pnl_percent']] = frame[['pnl', 'pnl_percent']].fillna(0.0)
+
+    return frame.astype({
+        'ticker': 'category',
+        'action': 'category',
+        'position_type': 'category',
+        'quantity': np.int32,
+        'price': np.float64,
+        'value': np.float64,
+        'fee': np.float64,
+        'pnl': np.float64,
+        'pnl_percent': np.float64,
+        'timestamp': 'datetime64[ns]',
+        'confidence_score': np.float64
+    })
+
+def extend_trades_frame(frame, trades):
+    """
+    Bring a typed trades DataFrame up to date with the trade records.
+
+    The record list is append-only, so only records added since the frame
+    was built are converted; the frame is rebuilt if the list got shorter.
+
+    Args:
+        frame (pandas.DataFrame): Frame from a previous call, or None.
+        trades (list): Trade records as stored in st.session_state.trades.
+
+    Returns:
+        pandas.DataFrame: One row per trade with the columns in TRADE_COLUMNS.
+    """
+    if frame is None or len(frame) > len(trades):
+        return trades_to_frame(trades)
+    if len(frame) == len(trades):
+        return frame
+
+    new_rows = trades_to_frame(trades[len(frame):])
+    combined = pd.concat([frame, new_rows], ignore_index=True)
+
+    # Concatenating categoricals with different categories falls back to object
+    return combined.astype({column: 'category' for column in ('ticker', 'action', 'position_type')})
+
+def closing_trade_pnl(open_price, close_price, quantity, fee_rate, position_type='LONG'):
+    """
+    P&L of closing part or all of a position, net of broker fees on both trades.
+
+    Args:
+        open_price (float): Average price the position was opened at.
+        close_price (float): Price the position is closed at.
+        quantity (int): Number of shares closed.
+        fee_rate (float): Fraction of each trade's value charged as broker fee.
+        position_type (str): 'LONG' or 'SHORT'.
+
+    Returns:
+        tuple: Closing trade value, closing fee, P&L and P&L percent of the opening value.
+    """
+    open_value = open_price * quantity
+    close_value = close_price * quantity
+    open_fee = open_value * fee_rate
+    close_fee = close_value * fee_rate
+
+    # A short position gains when it is bought back below the price it was sold at
+    if position_type == 'LONG':
+        pnl = close_value - open_value - open_fee - close_fee
+    else:
+        pnl = open_value - close_value - open_fee - close_fee
+
+    return close_value, close_fee, pnl, (pnl / open_value) * 100